@@ -5,3 +5,4 @@ from .models import BBox
 from .utils import pair_satellite_with_level
 from .query import batch_query
 from .credentials import get_credentials
+from .cache import cached_query
@@ -0,0 +1,168 @@
+from typing import Any, Callable, TypeVar
+from earth_extractor import core
+from enum import Enum
+import datetime
+import functools
+import hashlib
+import inspect
+import logging
+import os
+import tempfile
+import time
+import orjson
+import shapely.geometry.base
+
+
+# Define logger for this module
+logger = logging.getLogger(__name__)
+logger.setLevel(core.config.constants.LOGLEVEL_MODULE_DEFAULT)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def _canonicalise(value: Any) -> Any:
+    """Convert a query argument into a JSON serialisable, stable value
+
+    Geometries are represented by their WKB, datetimes by their ISO format
+    and enums by their values. Other objects (such as satellites) fall back
+    to their string representation.
+    """
+
+    if isinstance(value, shapely.geometry.base.BaseGeometry):
+        return value.wkb_hex
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return _canonicalise(value.value)
+    if isinstance(value, (list, tuple)):
+        return [_canonicalise(item) for item in value]
+    if isinstance(value, dict):
+        return sorted(
+            [str(key), _canonicalise(item)] for key, item in value.items()
+        )
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+
+    return str(value)
+
+
+def _is_empty(results: Any) -> bool:
+    """Whether query results hold no products
+
+    STAC searches return a FeatureCollection, which is empty when it has no
+    features. Other results are empty when they are falsy, such as an empty
+    list.
+    """
+
+    if isinstance(results, dict) and "features" in results:
+        return not results["features"]
+
+    return not results
+
+
+def _prune(cache_dir: str, ttl: int) -> None:
+    """Delete the files in the cache directory that are older than the TTL
+
+    This removes expired results, along with any temporary file left behind
+    by an interrupted write, so that the directory does not grow without
+    bound.
+    """
+
+    expiry = time.time() - ttl
+    try:
+        with os.scandir(cache_dir) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < expiry:
+                        os.remove(entry.path)
+                except OSError:
+                    pass  # Removed by another process in the meantime
+    except OSError as e:
+        logger.debug(f"Could not prune query cache {cache_dir}: {e}")
+
+
+def _write(cache_dir: str, cache_file: str, results: Any) -> None:
+    """Write the results to the cache file as JSON
+
+    The results are written to a temporary file first, and then moved into
+    place, so that a concurrent reader never sees a partially written file.
+    """
+
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_file = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(orjson.dumps(results))
+        os.replace(tmp_file, cache_file)
+    except BaseException:
+        os.remove(tmp_file)
+        raise
+
+
+def cached_query(func: F) -> F:
+    """Cache the results of a provider query method on disk
+
+    The results are stored as JSON in the QUERY_CACHE_DIR directory, keyed by
+    a hash of the provider, the method and its arguments. A cached result is
+    reused while it is younger than QUERY_CACHE_TTL seconds, which avoids
+    repeating the same network queries when a search is run again, for
+    example after a failed download or while adjusting the download options.
+    Expired results are deleted whenever new results are written.
+
+    Setting QUERY_CACHE_TTL to 0 (for example with the environment variable
+    `QUERY_CACHE_TTL=0`) disables the cache. Results without any products
+    are not cached, so that newly published products are found on the next
+    query. The decorated method must return JSON serialisable results.
+    """
+
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        ttl = core.config.constants.QUERY_CACHE_TTL
+        if ttl <= 0:
+            return func(self, *args, **kwargs)
+
+        arguments = signature.bind(self, *args, **kwargs)
+        arguments.apply_defaults()
+        key_elements = [
+            type(self).__name__,
+            self.name,
+            func.__name__,
+            _canonicalise(
+                {k: v for k, v in arguments.arguments.items() if k != "self"}
+            ),
+        ]
+        key = hashlib.blake2b(
+            orjson.dumps(key_elements), digest_size=20
+        ).hexdigest()
+        cache_dir = core.config.constants.QUERY_CACHE_DIR
+        cache_file = os.path.join(cache_dir, f"{key}.json")
+
+        try:
+            if time.time() - os.path.getmtime(cache_file) < ttl:
+                with open(cache_file, "rb") as f:
+                    results = orjson.loads(f.read())
+                logger.info(
+                    f"{self.name}: Using cached query results from "
+                    f"{cache_file} (set QUERY_CACHE_TTL=0 to disable)"
+                )
+                return results
+        except FileNotFoundError:
+            pass
+        except (OSError, orjson.JSONDecodeError) as e:
+            logger.debug(f"Ignoring unreadable query cache {cache_file}: {e}")
+
+        results = func(self, *args, **kwargs)
+
+        if not _is_empty(results):
+            _prune(cache_dir, ttl)
+            try:
+                _write(cache_dir, cache_file, results)
+            except (OSError, TypeError) as e:
+                # TypeError is raised for results that are not serialisable
+                logger.debug(f"Could not write query cache {cache_file}: {e}")
+
+        return results
+
+    return wrapper  # type: ignore
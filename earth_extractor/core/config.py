@@ -2,6 +2,7 @@ from pydantic import BaseSettings
 import logging
 import os
 import datetime
+from typing import Tuple
 
 
 class Constants(BaseSettings):
@@ -15,11 +16,30 @@ class Constants(BaseSettings):
     HIDE_PASSWORD_PROMPT: bool = False
 
     DEFAULT_DOWNLOAD_THREADS: int = 10
+    DOWNLOAD_CHUNK_SIZE: int = 1024 * 1024  # Bytes read and written at once
+    # Range requests used to download a single large file, 1 to disable
+    DOWNLOAD_PARALLELISM: int = 1
+    DOWNLOAD_PARALLELISM_MIN_SIZE: int = 64 * 1024 * 1024  # Bytes
     PARRALLEL_PROCESSES_DEFAULT: int = 4
 
+    # HTTP requests to provider APIs
+    REQUEST_TIMEOUT: Tuple[float, float] = (5, 60)  # Connect, read (seconds)
+    HTTP_POOL_MAXSIZE: int = 16  # Connections kept alive per host
+    MAX_REQUEST_ATTEMPTS: int = 5
+
     KEYRING_ID: str = "earth-extractor"
     COPERNICUS_APPLICATION_ID: str = "cdse-public"
 
+    # Items requested per page of a STAC search. The server default is often
+    # small (100 for NASA CMR), so a larger page saves round trips
+    STAC_PAGE_LIMIT: int = 500
+
+    # Query cache, set QUERY_CACHE_TTL to 0 to disable
+    QUERY_CACHE_DIR: str = os.path.join(
+        os.path.expanduser("~"), ".cache", "earth-extractor", "queries"
+    )
+    QUERY_CACHE_TTL: int = 3600  # Seconds
+
     # Logging
     LOGLEVEL_MODULE_DEFAULT: int = logging.DEBUG
     LOGFILE_NAME: str = f"{COMMON_TIMESTAMP}.log"
@@ -7,8 +7,7 @@ def setup_file_logger(output_folder):
     # Add a file logger
 
     # Create folder if it doesn't exist
-    if not os.path.exists(output_folder):
-        os.makedirs(output_folder)
+    os.makedirs(output_folder, exist_ok=True)
 
     logfile_handler = logging.FileHandler(
         os.path.join(output_folder, core.constants.LOGFILE_NAME)
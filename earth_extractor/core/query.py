@@ -128,27 +128,24 @@ def convert_geodataframe_to_query_results(
         The query results
     """
 
-    # Convert the GeoDataFrame to a list of dicts
-    query_results = [x for x in gdf.to_dict("records")]
-    query_results = []
-    for idx, row in gdf.iterrows():
-        query_results.append(
-            CommonSearchResult(
-                satellite=row["satellite"],
-                product_id=row["product_id"],
-                link=row["link"],
-                identifier=row["identifier"],
-                filename=row["filename"],
-                time=row["time"],
-                cloud_cover_percentage=row["cloud_cover_percentage"],
-                size=row["size"],
-                processing_level=row["processing_level"],
-                sensor=row["sensor"],
-                geometry=row["geometry"],
-            )
+    # Build a CommonSearchResult from each row's plain dict, rather than
+    # building a pandas Series for every row with iterrows()
+    return [
+        CommonSearchResult(
+            satellite=row["satellite"],
+            product_id=row["product_id"],
+            link=row["link"],
+            identifier=row["identifier"],
+            filename=row["filename"],
+            time=row["time"],
+            cloud_cover_percentage=row["cloud_cover_percentage"],
+            size=row["size"],
+            processing_level=row["processing_level"],
+            sensor=row["sensor"],
+            geometry=row["geometry"],
         )
-
-    return query_results
+        for row in gdf.to_dict("records")
+    ]
 
 
 def batch_query(
@@ -1,4 +1,4 @@
-from typing import Tuple, List, Dict, Any, Union
+from typing import Tuple, List, Dict, Any, Union, Optional
 from earth_extractor import core
 from earth_extractor.core.models import CommonSearchResult
 import logging
@@ -17,7 +17,9 @@ import datetime
 import pandas as pd
 from dataclasses import asdict
 import requests
+from requests.adapters import HTTPAdapter
 import os
+import threading
 import tqdm
 import tenacity
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -27,6 +29,9 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 logger = logging.getLogger(__name__)
 logger.setLevel(core.config.constants.LOGLEVEL_MODULE_DEFAULT)
 
+_download_session: Optional[requests.Session] = None
+_download_session_lock = threading.Lock()
+
 
 def pair_satellite_with_level(
     choice: SatelliteChoices,
@@ -119,6 +124,32 @@ def is_float(string):
         return False
 
 
+def parse_utc_timestamp(timestamp: str) -> datetime.datetime:
+    """Parse an ISO 8601 UTC timestamp of the form 2022-11-19T00:42:00.000Z
+
+    Uses the C implementation of `datetime.fromisoformat`, which is much
+    faster than `strptime` when translating thousands of search results.
+    Timestamps that it does not accept (for example, a fraction of seconds
+    with other than three or six digits on older Python versions) fall back
+    to `strptime`. The returned datetime is naive, in UTC.
+
+    Parameters
+    ----------
+    timestamp : str
+        The timestamp, with a trailing `Z`
+
+    Returns
+    -------
+    datetime.datetime
+        The parsed timestamp
+    """
+
+    try:
+        return datetime.datetime.fromisoformat(timestamp.rstrip("Z"))
+    except ValueError:
+        return datetime.datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%S.%fZ")
+
+
 def buffer_in_metres(
     input_geom: GeometryCollection,
     buffer_metres: Union[float, int],
@@ -267,7 +298,7 @@ def download_by_frequency(
                 f"for ID: {result['product_id']} ({result['satellite']}), "
                 "ignoring."
             )
-            logger.debug(f"Query result ignored: {result}")
+            logger.debug("Query result ignored: %s", result)
         else:
             cleaned_query_results.append(result)
 
@@ -303,12 +334,17 @@ def download_by_frequency(
         for x in filtered.to_dict("records")
     ]
 
+    # Per-result debug messages use %-style arguments, so that they are only
+    # formatted when a handler emits them
     for result in results:
         logger.debug(
-            f"Interval filter results: {result.satellite} "
-            f"({result.processing_level}), File: {result.filename}, "
-            f"Time: {result.time}, "
-            f"{filter_field}: {getattr(result, filter_field)}"
+            "Interval filter results: %s (%s), File: %s, Time: %s, %s: %s",
+            result.satellite,
+            result.processing_level,
+            result.filename,
+            result.time,
+            filter_field,
+            getattr(result, filter_field),
         )
 
     logger.info(
@@ -320,11 +356,76 @@ def download_by_frequency(
     return results
 
 
+def is_transient_error(exception: BaseException) -> bool:
+    """Whether a failed download or API request is worth retrying
+
+    Connection problems, rate limiting (HTTP 429) and server errors (HTTP 5xx)
+    are usually temporary, as are the incomplete downloads and server error
+    pages detected by `download_with_progress()` and truncated JSON responses
+    (ValueError). Other client errors, such
+    as an expired token (401) or a missing file (404), will fail again on
+    every attempt.
+    """
+
+    if isinstance(exception, requests.HTTPError):
+        status_code = (
+            exception.response.status_code
+            if exception.response is not None
+            else None
+        )
+        return status_code is None or status_code == 429 or status_code >= 500
+
+    return isinstance(
+        exception,
+        (
+            requests.ConnectionError,
+            requests.Timeout,
+            requests.exceptions.ChunkedEncodingError,
+            RuntimeError,
+            ValueError,
+        ),
+    )
+
+
+def get_download_session() -> requests.Session:
+    """The HTTP session shared by all downloads of `download_with_progress()`
+
+    The session is created on first use and kept for the lifetime of the
+    process, so that the download threads reuse pooled connections to the
+    provider rather than negotiating a new TLS connection for each file.
+    Failed downloads are retried by `download_with_progress()` itself, so the
+    session does not retry requests.
+
+    Returns
+    -------
+    requests.Session
+        The shared download session
+    """
+
+    global _download_session
+
+    with _download_session_lock:
+        if _download_session is None:
+            session = requests.Session()
+            session.mount(
+                "https://",
+                HTTPAdapter(
+                    pool_maxsize=core.config.constants.HTTP_POOL_MAXSIZE
+                ),
+            )
+            _download_session = session
+
+    return _download_session
+
+
 @tenacity.retry(
     stop=tenacity.stop_after_attempt(
         core.config.constants.MAX_DOWNLOAD_ATTEMPTS
     ),
-    wait=tenacity.wait_exponential(multiplier=1, min=4, max=10),
+    # Jitter spreads out the retries of the parallel downloads, rather than
+    # having every thread retry against the server at the same moment
+    wait=tenacity.wait_exponential_jitter(initial=4, max=60),
+    retry=tenacity.retry_if_exception(is_transient_error),
     reraise=True,
 )
 def download_with_progress(
@@ -332,6 +433,7 @@ def download_with_progress(
     output_folder: str,
     headers: Dict[str, str] = {},
     overwrite: bool = False,
+    parallelism: int = core.config.constants.DOWNLOAD_PARALLELISM,
 ) -> None:
     """Downloads a file with a progress bar
 
@@ -355,9 +457,15 @@ def download_with_progress(
         for some providers that require authentication.
     overwrite : bool, optional
         Whether to overwrite existing files, by default False
+    parallelism : int, optional
+        The number of concurrent range requests used to download a file of at
+        least DOWNLOAD_PARALLELISM_MIN_SIZE bytes, when the server accepts
+        them, by default core.constants.DOWNLOAD_PARALLELISM
     """
 
-    with requests.get(url, stream=True, headers=headers) as resp:
+    with get_download_session().get(
+        url, stream=True, headers=headers
+    ) as resp:
         resp.raise_for_status()
         total_size = int(resp.headers.get("content-length", -1))
 
@@ -419,18 +527,33 @@ def download_with_progress(
                     "overwriting existing file."
                 )
 
-        with open(output_file, "wb") as dest:
-            with tqdm.tqdm(
-                total=total_size,
-                desc=url,
-                unit="iB",
-                unit_scale=True,
-                unit_divisor=1024,
-            ) as bar:
-                for chunk in resp.iter_content(chunk_size=4096):
-                    if chunk:  # filter out keep-alive new chunks
-                        size = dest.write(chunk)
-                        bar.update(size)
+        if (
+            parallelism > 1
+            and total_size
+            >= core.config.constants.DOWNLOAD_PARALLELISM_MIN_SIZE
+            and resp.headers.get("Accept-Ranges") == "bytes"
+        ):
+            # The parts are requested separately, so the body of this
+            # response is not read
+            resp.close()
+            download_in_parts(
+                url, output_file, total_size, headers, parallelism
+            )
+        else:
+            with open(output_file, "wb") as dest:
+                with tqdm.tqdm(
+                    total=total_size,
+                    desc=url,
+                    unit="iB",
+                    unit_scale=True,
+                    unit_divisor=1024,
+                ) as bar:
+                    for chunk in resp.iter_content(
+                        chunk_size=core.config.constants.DOWNLOAD_CHUNK_SIZE
+                    ):
+                        if chunk:  # filter out keep-alive new chunks
+                            size = dest.write(chunk)
+                            bar.update(size)
 
     # Check size of downloaded file
     output_size = os.path.getsize(output_file)
@@ -450,6 +573,110 @@ def download_with_progress(
     return
 
 
+def download_in_parts(
+    url: str,
+    output_file: str,
+    total_size: int,
+    headers: Dict[str, str] = {},
+    parallelism: int = core.config.constants.DOWNLOAD_PARALLELISM,
+) -> None:
+    """Downloads a file with concurrent HTTP range requests
+
+    The file is split into `parallelism` parts of about the same size, which
+    are downloaded concurrently and written at their offset in the output
+    file. This uses several connections for a single large file, rather than
+    a single stream that may not fill the available bandwidth.
+
+    Parameters
+    ----------
+    url : str
+        The URL to download, from a server that accepts range requests
+    output_file : str
+        The path of the output file
+    total_size : int
+        The size of the file in bytes
+    headers : Dict[str, str], optional
+        The headers to use for the download, by default {}
+    parallelism : int, optional
+        The number of parts downloaded concurrently, by default
+        core.constants.DOWNLOAD_PARALLELISM
+
+    Raises
+    ------
+    ValueError
+        If the server does not return a part as requested
+    """
+
+    part_size = -(-total_size // parallelism)  # Round up
+    parts = [
+        (start, min(start + part_size, total_size))
+        for start in range(0, total_size, part_size)
+    ]
+
+    # Allocate the whole file, so that each part is written at its offset
+    with open(output_file, "wb") as dest:
+        dest.truncate(total_size)
+
+    with tqdm.tqdm(
+        total=total_size,
+        desc=url,
+        unit="iB",
+        unit_scale=True,
+        unit_divisor=1024,
+    ) as bar:
+        with ThreadPoolExecutor(max_workers=len(parts)) as executor:
+            futures = [
+                executor.submit(
+                    _download_part, url, output_file, start, end, headers, bar
+                )
+                for start, end in parts
+            ]
+
+            # Raise the first error, once all the parts are finished
+            for future in futures:
+                future.result()
+
+
+def _download_part(
+    url: str,
+    output_file: str,
+    start: int,
+    end: int,
+    headers: Dict[str, str],
+    bar: tqdm.tqdm,
+) -> None:
+    """Downloads the bytes from start to end (excluded) of the output file"""
+
+    with get_download_session().get(
+        url,
+        stream=True,
+        headers={**headers, "Range": f"bytes={start}-{end - 1}"},
+    ) as resp:
+        resp.raise_for_status()
+        if resp.status_code != 206:
+            raise ValueError(
+                f"Server did not return the bytes {start}-{end - 1} of {url}"
+            )
+
+        written = 0
+        with open(output_file, "r+b") as dest:
+            dest.seek(start)
+            for chunk in resp.iter_content(
+                chunk_size=core.config.constants.DOWNLOAD_CHUNK_SIZE
+            ):
+                if chunk:
+                    size = dest.write(chunk)
+                    written += size
+                    bar.update(size)
+
+    # The file is allocated in full, so its size does not reveal a short part
+    if written != end - start:
+        raise ValueError(
+            f"Downloaded part {start}-{end - 1} of {output_file} is not the "
+            f"expected size, retrying download"
+        )
+
+
 def download_parallel(
     urls: List[str],
     output_folder: str,
@@ -492,8 +719,9 @@ def download_parallel(
             try:
                 result = future.result()
                 logger.debug(
-                    f"Downloaded file successfully (threading): {url} "
-                    f"({result})"
+                    "Downloaded file successfully (threading): %s (%s)",
+                    url,
+                    result,
                 )
             except Exception as e:
                 logger.error(f"{url} generated an exception: {e}")
@@ -1,15 +1,22 @@
 from earth_extractor.providers import Provider
 import logging
-from typing import List
+from typing import Iterable, Iterator, List
 import asf_search
 from earth_extractor.core.credentials import get_credentials
 from earth_extractor import core
-from earth_extractor.providers.extensions.asf_search import granule_search
+from earth_extractor.providers.extensions.asf_search import (
+    granule_search_generator,
+    download_products,
+)
+import itertools
 
 logger = logging.getLogger(__name__)
 logger.setLevel(core.config.constants.LOGLEVEL_MODULE_DEFAULT)
 
-credentials = get_credentials()
+# Let the asf_search logs propagate at the module default level. This is done
+# once at import rather than on every download_many() call
+asf_logger = logging.getLogger("asf_search")
+asf_logger.setLevel(core.config.constants.LOGLEVEL_MODULE_DEFAULT)
 
 
 class AlaskanSateliteFacility(Provider):
@@ -25,46 +32,68 @@ class AlaskanSateliteFacility(Provider):
         # Check that the provider's credentials that are needed are set
         self._check_credentials_exist()
 
-        # Extract the file ids from the search results
-        search_file_ids = [
-            result.identifier
-            for result in search_results
-            if result.identifier is not None
-        ]
+        # Extract the file ids from the search results, keeping each once and
+        # in order, as overlapping queries can return the same granule
+        search_file_ids = list(
+            dict.fromkeys(
+                result.identifier
+                for result in search_results
+                if result.identifier is not None
+            )
+        )
+
+        if len(search_file_ids) == 0:
+            # Avoid authenticating and searching ASF when there is nothing
+            logger.info("No files to download, skipping")
+            return
 
         logger.info("Downloading from Alaskan Satellite Facility")
         logger.debug(f"Search file ids: {search_file_ids}")
 
-        # Add the ASF logger to the root logger
-        asf_logger = logging.getLogger("asf_search")
-        asf_logger.setLevel(core.config.constants.LOGLEVEL_MODULE_DEFAULT)
-
         self.create_download_folder(download_dir)  # Create the download folder
 
         # Authenticate with ASF
         try:
             session = asf_search.ASFSession().auth_with_token(
-                token=credentials.NASA_TOKEN,
+                token=get_credentials().NASA_TOKEN,
             )
 
-            # Search for the granules
-            res = granule_search(search_file_ids)
-            logger.info(
-                f"Found {len(res)} files to download (may include "
-                "metadata files)"
-            )
+            # Search for the granules. Each page of results is handed to the
+            # download pool as soon as it arrives, so downloads begin while
+            # the remaining pages are still being searched for
+            pages = granule_search_generator(search_file_ids)
+            products = itertools.chain.from_iterable(pages)
 
-            if len(res) == 0:
-                logger.info("No files to download, skipping")
-                return  # nothing to download
+            skipped: List[str] = []
+            if not overwrite:
+                # Skip granules that have already been downloaded in full
+                # without requesting them from ASF
+                products = _skip_downloaded(products, download_dir, skipped)
 
             # Download the granules using the ASF API library
-            res.download(
+            file_count = download_products(
+                products,
                 path=download_dir,
                 session=session,
                 processes=processes,
                 overwrite=overwrite,
             )
+
+            if skipped:
+                logger.info(
+                    f"{len(skipped)} files already downloaded, skipping"
+                )
+                logger.debug(f"Already downloaded: {skipped}")
+
+            if file_count == 0:
+                if not skipped:
+                    logger.info("No files to download, skipping")
+                return  # nothing to download
+
+            logger.info(
+                f"Processed {file_count} files from ASF (may include "
+                "metadata files)"
+            )
         except asf_search.ASFAuthenticationError as e:
             logger.error(
                 "ASF authentication error. Check your credentials and make "
@@ -76,6 +105,24 @@ class AlaskanSateliteFacility(Provider):
             return
 
 
+def _skip_downloaded(
+    products: Iterable[asf_search.ASFProduct],
+    download_dir: str,
+    skipped: List[str],
+) -> Iterator[asf_search.ASFProduct]:
+    """Yield the products that have not yet been downloaded in full
+
+    The file names of the products that are skipped are appended to
+    `skipped`, so that they can be reported once the download is done.
+    """
+
+    for product in products:
+        if product.is_downloaded(download_dir):
+            skipped.append(product.properties["fileName"])
+        else:
+            yield product
+
+
 asf: AlaskanSateliteFacility = AlaskanSateliteFacility(
     name="Alaskan Satellite Facility",
     description="Alaskan Satellite Facility",
@@ -3,10 +3,14 @@ from earth_extractor import core
 import logging
 import datetime
 import os
+import orjson
 import shapely.geometry
 from earth_extractor.core.models import CommonSearchResult
 from earth_extractor.core.credentials import get_credentials
+from earth_extractor.core.cache import cached_query
 from pystac_client import Client
+from pystac_client.stac_api_io import StacApiIO
+from functools import cached_property, lru_cache
 
 if TYPE_CHECKING:
     from earth_extractor.satellites import enums
@@ -15,7 +19,27 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 logger.setLevel(core.config.constants.LOGLEVEL_MODULE_DEFAULT)
 
-credentials = get_credentials()
+
+class OrjsonStacApiIO(StacApiIO):
+    """A STAC API IO that parses responses with orjson
+
+    Each page of a STAC search holds up to STAC_PAGE_LIMIT items, and
+    orjson parses them several times faster than the standard library.
+    """
+
+    def json_loads(self, txt: str, *args: Any, **kwargs: Any) -> Dict:
+        return orjson.loads(txt)
+
+
+@lru_cache(maxsize=32)
+def _open_catalog(provider_uri: str) -> Client:
+    """Open a STAC catalog, caching the client per provider URI
+
+    Opening the catalog fetches and parses the root of the STAC API, which
+    does not change within a session, so it is only done once per URI.
+    """
+
+    return Client.open(provider_uri, stac_io=OrjsonStacApiIO())
 
 
 class Provider:
@@ -24,10 +48,10 @@ class Provider:
         name: str,
         description: Optional[str] = None,
         uri: Optional[str] = None,
-        products: Dict[
-            Tuple["enums.Satellite", "enums.ProcessingLevel"], List[Any]
-        ] = {},
-        credentials_required: List[Optional[str]] = [],
+        products: Optional[
+            Dict[Tuple["enums.Satellite", "enums.ProcessingLevel"], List[Any]]
+        ] = None,
+        credentials_required: Optional[List[Optional[str]]] = None,
     ):
         """A provider of satellite data
 
@@ -73,8 +97,12 @@ class Provider:
         self.name = name
         self.description = description
         self.uri = uri
-        self.products = products
-        self.credentials_required = credentials_required
+        # Give each provider its own containers, rather than sharing mutable
+        # default arguments between all providers that do not set them
+        self.products = products if products is not None else {}
+        self.credentials_required = (
+            credentials_required if credentials_required is not None else []
+        )
 
     def query(
         self,
@@ -110,8 +138,7 @@ class Provider:
     ) -> None:
         """Create a download folder if it doesn't exist"""
 
-        if not os.path.exists(folder_name):
-            os.makedirs(folder_name)
+        os.makedirs(folder_name, exist_ok=True)
 
     def translate_search_results(
         self,
@@ -123,12 +150,15 @@ class Provider:
             f"{self.name} ({self.description})"
         )
 
-    @property
+    @cached_property
     def _products_reversed(
         self,
     ) -> Dict[Any, Tuple["enums.Satellite", "enums.ProcessingLevel"]]:
         """A reverse of the property dictionary
 
+        Built once on first access and cached, as it is looked up for every
+        record when translating search results.
+
         Makes sure that each item in the list each value is now its own key
         and the original key is now a value in the list
 
@@ -150,6 +180,7 @@ class Provider:
 
         return products_reversed
 
+    @cached_query
     def query_stac(
         self,
         provider_uri: str,
@@ -161,7 +192,8 @@ class Provider:
         """A generic STAC query method for providers that support STAC
 
         Input geometry will be converted to a bounding box as some queries will
-        fail with complex geometries.
+        fail with complex geometries. Results are cached on disk for
+        QUERY_CACHE_TTL seconds (see `core.cache.cached_query`).
 
         Parameters
         ----------
@@ -182,23 +214,25 @@ class Provider:
             A dictionary of the results
         """
 
-        catalog = Client.open(provider_uri)
+        catalog = _open_catalog(provider_uri)
 
-        # Convert roi to bbox STAC does not like complicated geometries
-        roi_bbox = shapely.geometry.box(*roi.bounds)
+        # Convert roi to bbox STAC does not like complicated geometries. The
+        # bounds are given as-is, avoiding building a polygon to serialise
+        roi_bbox = roi.bounds
 
         logger.info(f"Querying STAC URI: {provider_uri}")
         search = catalog.search(
             collections=collections,
-            intersects=roi_bbox,
-            datetime=[start_date.isoformat(), end_date.isoformat()],
+            bbox=roi_bbox,
+            datetime=f"{start_date.isoformat()}/{end_date.isoformat()}",
+            limit=core.config.constants.STAC_PAGE_LIMIT,
         )
 
         return search.item_collection_as_dict()
 
     def _check_credentials_exist(self) -> None:
         for credential in self.credentials_required:
-            if getattr(credentials, credential) is None:
+            if getattr(get_credentials(), credential) is None:
                 raise ValueError(
                     f"Credential '{credential}' for {self.name} is required "
                     "but its value has not been set, please set the "
@@ -1,15 +1,31 @@
 from earth_extractor.providers import Provider
 from earth_extractor.core.credentials import get_credentials
 from earth_extractor.core.models import CommonSearchResult
-from typing import Any, List, TYPE_CHECKING, Dict, Optional
+from earth_extractor.core.cache import cached_query
+from typing import (
+    Any,
+    List,
+    TYPE_CHECKING,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+)
 import logging
 import datetime
+import itertools
+import operator
+import os
+import orjson
+import time
 import shapely
 import shapely.geometry
-from shapely import wkt
 from earth_extractor.satellites import enums
 from earth_extractor import core
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from earth_extractor.core.config import constants
 
 if TYPE_CHECKING:
@@ -18,40 +34,149 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 logger.setLevel(core.config.constants.LOGLEVEL_MODULE_DEFAULT)
 
-credentials = get_credentials()
+# Products per page of an OData query, the largest offset ($skip) accepted by
+# the catalogue, and the number of pages (or product types) requested
+# concurrently
+ODATA_PAGE_SIZE = 1000
+ODATA_MAX_SKIP = 10000
+ODATA_PAGE_THREADS = 4
+
+# Request only the product fields that are translated, and the productType
+# attribute, rather than every attribute and asset of each product
+ODATA_SELECT = (
+    "&$select=Id,Name,S3Path,ContentLength,OriginDate,Footprint"
+    "&$expand=Attributes($filter=Name eq 'productType')"
+)
+ODATA_EXPAND_ALL = "&$expand=Assets&$expand=Attributes"
+
+TOKEN_URL = (
+    "https://identity.dataspace.copernicus.eu/auth/realms/CDSE/"
+    "protocol/openid-connect/token"
+)
+# Seconds before their expiry that access and refresh tokens are renewed
+TOKEN_EXPIRY_MARGIN = 30
+
+# The fields of an OData product that are translated, fetched in one call
+_product_fields = operator.itemgetter(
+    "Id", "Name", "S3Path", "ContentLength", "OriginDate"
+)
 
 
 class CopernicusDataSpace(Provider):
+    _session: Optional[requests.Session] = None
+    _token: Optional[str] = None
+    _token_expiry: float = 0.0
+    _refresh_token: Optional[str] = None
+    _refresh_expiry: float = 0.0
+
+    @property
+    def session(self) -> requests.Session:
+        """A HTTP session shared by all requests to the Copernicus Data Space
+
+        The session is created on first use and then kept for the lifetime of
+        the provider, so that connections are pooled and reused for the
+        access token, across pages of a query and across successive queries,
+        rather than negotiating a new TLS connection for each request.
+
+        Requests that fail to connect, or that are rate limited (HTTP 429) or
+        hit a server error (HTTP 5xx), are retried by the connection pool with
+        an exponential backoff, waiting for the server's Retry-After header
+        when it is given.
+        """
+
+        if self._session is None:
+            retries = Retry(
+                total=constants.MAX_REQUEST_ATTEMPTS,
+                backoff_factor=1,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset(["GET", "POST"]),
+                respect_retry_after_header=True,
+                # Return the last response, raised by raise_for_status()
+                raise_on_status=False,
+            )
+            session = requests.Session()
+            session.mount(
+                "https://",
+                HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=constants.HTTP_POOL_MAXSIZE,
+                    max_retries=retries,
+                ),
+            )
+            self._session = session
+
+        return self._session
+
+    def _request_token(self, data: Dict[str, str]) -> Dict[str, Any]:
+        """Request an access token from the identity server"""
+
+        r = self.session.post(
+            TOKEN_URL, data=data, timeout=constants.REQUEST_TIMEOUT
+        )
+        r.raise_for_status()
+
+        return orjson.loads(r.content)
+
     def get_access_token(
         self: "CopernicusDataSpace",
         username: str | None,
         password: str | None,
         client_id: str = constants.COPERNICUS_APPLICATION_ID,
     ) -> str:
+        """Get an access token for downloading from the Copernicus Data Space
+
+        The token is kept until shortly before it expires, so that successive
+        downloads do not each request a new one. Once it has expired, it is
+        renewed with the refresh token, falling back to the username and
+        password when the refresh token has also expired or is rejected.
+        """
 
         if username is None or password is None:
             raise ValueError(
                 "Username and password are required to get an access token"
             )
-        data = {
-            "client_id": client_id,  # Set unique id for this application
-            "username": username,
-            "password": password,
-            "grant_type": "password",
-        }
-        try:
-            r = requests.post(
-                "https://identity.dataspace.copernicus.eu/auth/realms/CDSE/"
-                "protocol/openid-connect/token",
-                data=data,
-            )
-            r.raise_for_status()
-        except Exception as e:
-            raise Exception(
-                "Access token creation failed. Exception raised from the "
-                f"server was: {e}"
-            )
-        return r.json()["access_token"]
+
+        now = time.monotonic()
+        if self._token is not None and now < self._token_expiry:
+            return self._token
+
+        token = None
+        if self._refresh_token is not None and now < self._refresh_expiry:
+            try:
+                token = self._request_token(
+                    {
+                        "client_id": client_id,
+                        "grant_type": "refresh_token",
+                        "refresh_token": self._refresh_token,
+                    }
+                )
+            except requests.RequestException as e:
+                logger.debug(f"Access token refresh failed: {e}")
+
+        if token is None:
+            data = {
+                "client_id": client_id,  # Set unique id for this application
+                "username": username,
+                "password": password,
+                "grant_type": "password",
+            }
+            try:
+                token = self._request_token(data)
+            except requests.RequestException as e:
+                raise ValueError(
+                    f"Copernicus Data Space access token creation failed: {e}"
+                )
+
+        self._token = token["access_token"]
+        self._token_expiry = (
+            now + token.get("expires_in", 0) - TOKEN_EXPIRY_MARGIN
+        )
+        self._refresh_token = token.get("refresh_token")
+        self._refresh_expiry = (
+            now + token.get("refresh_expires_in", 0) - TOKEN_EXPIRY_MARGIN
+        )
+
+        return self._token
 
     def query(
         self,
@@ -67,16 +192,41 @@ class CopernicusDataSpace(Provider):
         No credentials are required to query
         """
 
-        # If cloud cover percentage is 100, set to None for API
-        if cloud_cover is None:
-            cloud_cover = 100
+        product_types = self.products.get(
+            (satellite.name, processing_level), []
+        )
+        if not product_types:
+            # Nothing to query, skip building the filters and the thread pool
+            logger.info(
+                f"No Copernicus Data Space product types for {satellite.name} "
+                f"at processing level {processing_level.value}"
+            )
+            return []
+
+        # The cloud cover and area filters are the same for every product
+        # type, build them once, serialising the ROI to WKT a single time.
+        # Cloud cover is left out when no maximum is given, or it is 100%
+        common_filters = []
+        if cloud_cover is not None and cloud_cover < 100:
+            common_filters.append(
+                "Attributes/OData.CSC.DoubleAttribute/"
+                "any(att:att/Name eq 'cloudCover' "
+                "and att/OData.CSC.DoubleAttribute/Value"
+                f" le {cloud_cover:.2f})"
+            )
+        if roi:
+            common_filters.append(
+                f"OData.CSC.Intersects(area=geography'SRID=4326;{roi.wkt}')"
+            )
 
-        # Variable to combine all CommonSearchResult objects into one
-        all_products = []
+        # The date range is the same for every product type, format it once
+        date_filters = [
+            f"ContentDate/Start gt {start_date.isoformat()}.000Z",
+            f"ContentDate/Start lt {end_date.isoformat()}.000Z",
+        ]
 
-        for product_type in self.products.get(
-            (satellite.name, processing_level), []
-        ):
+        query_urls = []
+        for product_type in product_types:
             # We do a list here because in some cases, a satellite may have
             # multiple product types for a given processing level (sentinel 3
             # has two product types for L2)
@@ -94,56 +244,114 @@ class CopernicusDataSpace(Provider):
                 "https://catalogue.dataspace.copernicus.eu/odata/v1/"
                 "Products?$filter="
             )
-            query_elements = []
-            try:
-                if cloud_cover and cloud_cover < 100:
-                    query_elements.append(
-                        f"Attributes/OData.CSC.DoubleAttribute/"
-                        "any(att:att/Name eq 'cloudCover' "
-                        "and att/OData.CSC.DoubleAttribute/Value"
-                        f" le {cloud_cover:.2f})"
-                    )
-                if roi:
-                    query_elements.append(
-                        "OData.CSC.Intersects("
-                        f"area=geography'SRID=4326;{roi.wkt}')"
+            query_elements = list(common_filters)
+            query_elements.append(
+                f"Attributes/OData.CSC.StringAttribute/"
+                "any(att:att/Name eq 'productType' "
+                "and att/OData.CSC.StringAttribute/Value eq "
+                f"'{product_type}')"
+            )
+            query_elements.extend(date_filters)
+
+            # Order the results so that pages requested by their offset
+            # do not overlap, and ask for the total count of results
+            query_urls.append(
+                f"{base_url}{' and '.join(query_elements)}"
+                "&$orderby=ContentDate/Start"
+                f"&$count=True&$top={ODATA_PAGE_SIZE}"
+            )
+
+        try:
+            # Query the product types concurrently over the shared session,
+            # and translate the results to a common format
+            with ThreadPoolExecutor(
+                max_workers=min(len(query_urls), ODATA_PAGE_THREADS)
+            ) as executor:
+                return list(
+                    itertools.chain.from_iterable(
+                        self.translate_search_results({"value": products})
+                        for products in executor.map(
+                            self._query_products, query_urls
+                        )
                     )
-                query_elements.append(
-                    f"Attributes/OData.CSC.StringAttribute/"
-                    "any(att:att/Name eq 'productType' "
-                    "and att/OData.CSC.StringAttribute/Value eq "
-                    f"'{product_type}')"
-                )
-                query_elements.append(
-                    f"ContentDate/Start gt {start_date.isoformat()}.000Z"
-                )
-                query_elements.append(
-                    f"ContentDate/Start lt {end_date.isoformat()}.000Z"
                 )
 
-                query_url = (
-                    f"{base_url}{' and '.join(query_elements)}"
-                    "&$expand=Assets&$expand=Attributes&$top=1000"
-                )
+        except Exception as e:
+            logger.error(f"Authentication error: {e}")
+            return []
 
-                # Query the API
-                products = requests.get(query_url).json()
+    def _query_products(self, query_url: str) -> List[Dict[Any, Any]]:
+        """Query the products with only the fields that are translated
 
-                # Translate the results to a common format
-                all_products += self.translate_search_results(products)
-                count = 1
+        Catalogues that reject the selection of fields (HTTP 400) are queried
+        again for every field of the products.
+        """
+
+        try:
+            return self._query_odata(f"{query_url}{ODATA_SELECT}")
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code != 400:
+                raise
+            logger.debug(f"Selecting fields failed, querying all: {e}")
 
-                next_page = products.get("@odata.nextLink", None)
-                while next_page:
-                    products = requests.get(next_page).json()
-                    all_products += self.translate_search_results(products)
-                    next_page = products.get("@odata.nextLink", None)
-                    count += 1
-                    logger.info(f"Querying page {count}")
+        return self._query_odata(f"{query_url}{ODATA_EXPAND_ALL}")
 
-            except Exception as e:
-                logger.error(f"Authentication error: {e}")
-                return []
+    def _get_page(self, url: str) -> Dict[Any, Any]:
+        """Fetch one page of an OData query"""
+
+        r = self.session.get(url, timeout=constants.REQUEST_TIMEOUT)
+        r.raise_for_status()
+
+        return orjson.loads(r.content)
+
+    @cached_query
+    def _query_odata(self, query_url: str) -> List[Dict[Any, Any]]:
+        """Fetch every page of an OData product query
+
+        When the first page gives the total count of results, the remaining
+        pages are requested concurrently by their offset ($skip), rather than
+        following each page's nextLink one after the other.
+
+        Parameters
+        ----------
+        query_url : str
+            The URL of the first page of the query
+
+        Returns
+        -------
+        List[Dict[Any, Any]]
+            The products of all pages, as returned by the API
+        """
+
+        products = self._get_page(query_url)
+        all_products = products["value"]
+        total = products.get("@odata.count")
+        next_page = products.get("@odata.nextLink", None)
+
+        if next_page and total is not None and total <= ODATA_MAX_SKIP:
+            page_urls = [
+                f"{query_url}&$skip={skip}"
+                for skip in range(ODATA_PAGE_SIZE, total, ODATA_PAGE_SIZE)
+            ]
+            logger.info(
+                f"Querying {len(page_urls)} more pages of {total} products"
+            )
+            with ThreadPoolExecutor(
+                max_workers=min(len(page_urls), ODATA_PAGE_THREADS)
+            ) as executor:
+                # map() returns the pages in order of their offset
+                for products in executor.map(self._get_page, page_urls):
+                    all_products += products["value"]
+
+            return all_products
+
+        count = 1
+        while next_page:
+            products = self._get_page(next_page)
+            all_products += products["value"]
+            next_page = products.get("@odata.nextLink", None)
+            count += 1
+            logger.info(f"Querying page {count}")
 
         return all_products
 
@@ -172,34 +380,44 @@ class CopernicusDataSpace(Provider):
         None
         """
 
-        # Convert the search results to a list of URIs
+        # Unless overwriting, leave out the products that are already
+        # downloaded, so that each does not cost a request to the server
+        skipped: List[str] = []
+        if not overwrite:
+            search_results = list(
+                _skip_downloaded(search_results, download_dir, skipped)
+            )
+            if skipped:
+                logger.info(
+                    f"{len(skipped)} files already downloaded, skipping"
+                )
+                logger.debug(f"Already downloaded: {skipped}")
+
+        # Convert the search results to a list of URIs. Keep each URL once,
+        # in order, as the same product can be found by overlapping queries
+        urls = list(
+            dict.fromkeys(str(x.url) for x in search_results if x.url)
+        )
+        if not urls:
+            logger.info("No files to download")
+            return
 
         # Check that the provider's credentials that are needed are set
         self._check_credentials_exist()
 
-        try:
-            access_token = self.get_access_token(
-                credentials.COPERNICUS_USERNAME,
-                credentials.COPERNICUS_PASSWORD,
-            )
-        except Exception as e:
-            raise ValueError(
-                f"Copernicus Data Space access token creation failed: {e}"
-            )
-
-        urls = [str(x.url) for x in search_results if x.url]
+        credentials = get_credentials()
+        access_token = self.get_access_token(
+            credentials.COPERNICUS_USERNAME,
+            credentials.COPERNICUS_PASSWORD,
+        )
 
         auth_header = {"Authorization": f"Bearer {access_token}"}
 
-        for url in urls:
-            try:
-                core.utils.download_parallel(
-                    urls, download_dir, auth_header, overwrite, processes
-                )
-            except RuntimeError as e:
-                # Log the exception and continue to the next file
-                logger.error(e)
-                continue
+        # Failed downloads are logged by download_parallel, which continues
+        # with the remaining files
+        core.utils.download_parallel(
+            urls, download_dir, auth_header, overwrite, processes
+        )
 
     def translate_search_results(
         self, provider_search_results: Dict[Any, Any]
@@ -217,15 +435,20 @@ class CopernicusDataSpace(Provider):
                 The search results in a common format
         """
 
-        common_results = []
+        products_reversed = self._products_reversed
 
+        # Keep the products of a known type with their satellite and level
+        products = []
         for props in provider_search_results["value"]:
             # Get the satellite and processing level from reversed mapping of
             # the provider's "products" dictionary
-            sat, level = None, None
-            for odata_props in props["Attributes"]:
-                if odata_props["Name"] == "productType":
-                    sat, level = self._products_reversed[odata_props["Value"]]
+            attributes = {
+                attribute["Name"]: attribute["Value"]
+                for attribute in props["Attributes"]
+            }
+            sat, level = products_reversed.get(
+                attributes.get("productType"), (None, None)
+            )
 
             if sat is None or level is None:
                 logger.warn(
@@ -234,28 +457,37 @@ class CopernicusDataSpace(Provider):
                 )
                 continue
 
-            # Geometry is encoded with SRID, split, remove trailing apostrophe
-            wkt_geometry = props.get("Footprint").split(";")[-1][:-1]
-            geometry_shapely = wkt.loads(wkt_geometry)
+            products.append((props, sat, level))
+
+        # Parse all the geometries in a single call. They are encoded with
+        # SRID, split, remove trailing apostrophe
+        footprints = [props["Footprint"] for props, _, _ in products]
+        geometries = shapely.from_wkt(
+            [footprint.split(";")[-1][:-1] for footprint in footprints]
+        )
+
+        common_results = []
+        for (props, sat, level), geometry in zip(products, geometries):
+            product_id, name, s3_path, size, origin_date = _product_fields(
+                props
+            )
 
             url = (
                 "https://zipper.dataspace.copernicus.eu/odata/v1/"
-                f"Products({props.get('Id')})/$value"
+                f"Products({product_id})/$value"
             )
-            identifier = props.get("Name").split(".")[0]
+            identifier = name.split(".")[0]
 
             common_results.append(
                 CommonSearchResult(
-                    geometry=geometry_shapely,
-                    product_id=props.get("Id"),
-                    link=props.get("S3Path"),
+                    geometry=geometry,
+                    product_id=product_id,
+                    link=s3_path,
                     url=url,
                     identifier=identifier,
-                    filename=props.get("Name"),
-                    size=props.get("ContentLength"),
-                    time=datetime.datetime.strptime(
-                        props.get("OriginDate"), "%Y-%m-%dT%H:%M:%S.%fZ"
-                    ),
+                    filename=name,
+                    size=size,
+                    time=core.utils.parse_utc_timestamp(origin_date),
                     processing_level=level,
                     satellite=sat,
                 )
@@ -263,6 +495,34 @@ class CopernicusDataSpace(Provider):
         return common_results
 
 
+def _skip_downloaded(
+    search_results: Iterable[CommonSearchResult],
+    download_dir: str,
+    skipped: List[str],
+) -> Iterator[CommonSearchResult]:
+    """Yield the search results that have not yet been downloaded in full
+
+    The Copernicus Data Space serves each product as a `<filename>.zip`
+    archive. A product counts as downloaded when its archive is in the
+    download directory with the size given by the catalogue, so that an
+    incomplete download, or a product of unknown size, is downloaded again.
+    The file names of the products that are skipped are appended to
+    `skipped`, so that they can be reported.
+    """
+
+    for result in search_results:
+        if result.filename and result.size:
+            archive = os.path.join(download_dir, f"{result.filename}.zip")
+            try:
+                if os.path.getsize(archive) == result.size:
+                    skipped.append(result.filename)
+                    continue
+            except OSError:
+                pass  # Not downloaded yet
+
+        yield result
+
+
 copernicus_dataspace: CopernicusDataSpace = CopernicusDataSpace(
     name="scihub",
     description="Copernicus Data Space",
@@ -17,11 +17,14 @@ import urllib.parse
 import warnings
 import tqdm
 from earth_extractor import core
-from asf_search.download.download import _try_get_response
+from asf_search.download.download import (
+    _try_get_response,
+    strip_auth_if_aws,
+)
 from asf_search.exceptions import ASFDownloadError
 import logging
-from multiprocessing import Pool
-from typing import Generator, Union, Iterable, Tuple
+import orjson
+from typing import Generator, Union, Iterable, List, Tuple
 from copy import copy
 from tenacity import (
     retry,
@@ -39,7 +42,13 @@ from asf_search.exceptions import (
     ASFSearchError,
     CMRIncompleteError,
 )
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
 from asf_search.constants import INTERNAL
 from asf_search.search.error_reporting import report_search_error
 from asf_search.search.search_generator import (
@@ -48,23 +57,49 @@ from asf_search.search.search_generator import (
     process_page,
 )
 from asf_search.download.file_download_type import FileDownloadType
+from requests.adapters import HTTPAdapter
 
 # We may as well use our internal logger in this case if we have such freedom
 logger = logging.getLogger(__name__)
 logger.setLevel(core.config.constants.LOGLEVEL_MODULE_DEFAULT)
 
+# Granule name searches are split into chunks of this many names, searched
+# concurrently with up to GRANULE_SEARCH_THREADS threads
+GRANULE_SEARCH_CHUNK_SIZE = 100
+GRANULE_SEARCH_THREADS = 4
+
 """ The following method and class are overriden to support the overwrite
     argument. Futher below are the functions that this overridden class
     is injected into
 """
 
 
+def _is_complete(
+    filepath: str,
+    expected_size: int = None,
+) -> bool:
+    """Whether a file has already been downloaded in full
+
+    :param filepath: The path of the downloaded file
+    :param expected_size: The size in bytes the file should have. If None, the file only needs to exist
+    :return: True if the file exists with the expected size
+    """
+
+    try:
+        local_size = os.stat(filepath).st_size
+    except FileNotFoundError:
+        return False
+
+    return expected_size is None or local_size == expected_size
+
+
 def download_url(
     url: str,
     path: str,
     filename: str = None,
     session: ASFSession = None,
     overwrite: bool = False,
+    expected_size: int = None,
 ) -> None:
     """
     Downloads a product from the specified URL to the specified location and (optional) filename.
@@ -74,6 +109,7 @@ def download_url(
     :param filename: Optional filename to be used, extracted from the URL by default
     :param session: The session to use, in most cases should be authenticated beforehand
     :param overwrite: Whether to overwrite existing files.
+    :param expected_size: Size in bytes of the complete file, if known. An existing file of another size is downloaded again, resuming from its end when it is smaller.
     :return:
     """
 
@@ -85,38 +121,90 @@ def download_url(
             f"Error downloading {url}: directory not found: {path}"
         )
 
+    filepath = os.path.join(path, filename)
+    resume_from = 0
+
     # Allow overwriting by modifying the operation of this conditional
-    if os.path.isfile(os.path.join(path, filename)):
-        logger.info(
-            f"File already exists: {os.path.join(filename)} "
-            f"... {'Overwriting' if overwrite else 'Skipping'}"
-        )
+    if os.path.isfile(filepath):
+        if not overwrite and not _is_complete(filepath, expected_size):
+            local_size = os.path.getsize(filepath)
+            if local_size < expected_size:
+                resume_from = local_size
+            logger.info(
+                f"File exists {os.path.join(filename)} but does not match "
+                f"the expected size of {expected_size} bytes. "
+                f"{'Resuming' if resume_from else 'Redownloading'}."
+            )
+        else:
+            logger.info(
+                f"File already exists: {os.path.join(filename)} "
+                f"... {'Overwriting' if overwrite else 'Skipping'}"
+            )
 
-        if not overwrite:  # Don't download
-            return
+            if not overwrite:  # Don't download
+                return
 
     if session is None:
         session = ASFSession()
 
-    response = _try_get_response(session=session, url=url)
+    response = _get_response(session, url, resume_from)
+    resumed = response.status_code == 206
 
     # Improve download process with progress bar
     total_size = int(response.headers.get("content-length", -1))
+    if resumed and total_size != -1:
+        total_size += resume_from
 
-    with open(os.path.join(path, filename), "wb") as dest:
+    # Closing the response returns its connection to the session's pool, to
+    # be reused by the next download, even if the download fails
+    with response, open(filepath, "ab" if resumed else "wb") as dest:
         with tqdm.tqdm(
             total=total_size,
+            initial=resume_from if resumed else 0,
             desc=url,
             unit="iB",
             unit_scale=True,
             unit_divisor=1024,
         ) as bar:
-            for chunk in response.iter_content(chunk_size=8192):
+            for chunk in response.iter_content(
+                chunk_size=core.config.constants.DOWNLOAD_CHUNK_SIZE
+            ):
                 if chunk:
                     size = dest.write(chunk)
                     bar.update(size)
 
 
+def _get_response(session: ASFSession, url: str, resume_from: int = 0):
+    """
+    Requests the URL for download, from the byte `resume_from` onwards when it is not 0.
+
+    A server that ignores the range returns the whole file (200). For any other response than the requested range (206 with a matching Content-Range), the whole file is requested again.
+
+    :param session: The session to use
+    :param url: URL from which to download
+    :param resume_from: The size of the partial file already downloaded
+    :return: The streamed response, 206 when resuming
+    """
+
+    if resume_from:
+        response = session.get(
+            url,
+            stream=True,
+            headers={"Range": f"bytes={resume_from}-"},
+            hooks={"response": strip_auth_if_aws},
+        )
+        if response.status_code == 200:
+            return response  # Range ignored, this is the whole file
+        if response.status_code == 206 and response.headers.get(
+            "Content-Range", ""
+        ).startswith(f"bytes {resume_from}-"):
+            return response
+
+        response.close()
+
+    return _try_get_response(session=session, url=url)
+
+
 class ASFProductExtended(ASFProduct):
     # Extend the class to override the download function
     def download(
@@ -184,8 +272,27 @@ class ASFProductExtended(ASFProduct):
                 filename=filename,
                 session=session,
                 overwrite=overwrite,  # @evanjt Added to support overwriting
+                # Only the size of the default file is known from the search
+                expected_size=(
+                    self.properties.get("bytes")
+                    if url == self.properties["url"]
+                    else None
+                ),
             )
 
+    def is_downloaded(self, path: str) -> bool:
+        """
+        Whether the default file of this product already exists in the path with the size given by the search results.
+
+        :param path: The directory into which this product would be downloaded.
+        :return: True if the download of the default file is complete
+        """
+
+        return _is_complete(
+            os.path.join(path, self.properties["fileName"]),
+            self.properties.get("bytes"),
+        )
+
 
 """ As the search function creates a list of ASFProducts in its return,
     the following functions are required to inject the ASFProductExtended class
@@ -334,15 +441,16 @@ def query_cmr(
         session=session, url=url, translated_opts=translated_opts
     )
 
+    # Decode the page once, rather than once for the items and again for hits
+    page = orjson.loads(response.content)
+
     items = [
         ASFProductExtended(  # @evanjt Modified here to support overwriting
             f, session=session
         )
-        for f in response.json()["items"]
+        for f in page["items"]
     ]
-    hits: int = response.json()[
-        "hits"
-    ]  # total count of products given search opts
+    hits: int = page["hits"]  # total count of products given search opts
 
     # sometimes CMR returns results with the wrong page size
     if (
@@ -489,6 +597,66 @@ def granule_search(
     return search(opts=opts)  # @evanjt: Use local function for overwrite
 
 
+def granule_search_generator(
+    granule_list: Iterable[str],
+    opts: ASFSearchOptions = None,
+) -> Generator[ASFSearchResults, None, None]:
+    """
+    Performs a granule name search using the ASF SearchAPI, yielding the
+    results one page at a time
+
+    A list that fits in a single chunk is searched directly, and each page is
+    yielded as soon as it is returned by CMR. Longer lists are split into
+    chunks of GRANULE_SEARCH_CHUNK_SIZE that are searched concurrently, so
+    that CMR processes the chunks in parallel. Each chunk is searched in full
+    before its pages are yielded, in the order that the chunks complete.
+
+    :param granule_list: List of specific granules. Results may include several products per granule name.
+    :param opts: An ASFSearchOptions object describing the search parameters to be used. Search parameters specified outside this object will override in event of a conflict.
+
+    :return: Generator of ASFSearchResults(list), one per page of results
+    """
+
+    granule_list = list(granule_list)
+    chunks = [
+        granule_list[i : i + GRANULE_SEARCH_CHUNK_SIZE]
+        for i in range(0, len(granule_list), GRANULE_SEARCH_CHUNK_SIZE)
+    ]
+
+    if len(chunks) <= 1:
+        opts = ASFSearchOptions() if opts is None else copy(opts)
+        opts.merge_args(granule_list=granule_list)
+
+        yield from search_generator(opts=opts)
+        return
+
+    with ThreadPoolExecutor(
+        max_workers=min(len(chunks), GRANULE_SEARCH_THREADS)
+    ) as executor:
+        futures = [
+            executor.submit(_granule_search_chunk, chunk, opts)
+            for chunk in chunks
+        ]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def _granule_search_chunk(
+    granule_list: List[str],
+    opts: ASFSearchOptions = None,
+) -> List[ASFSearchResults]:
+    """Search one chunk of granules, returning all of its pages
+
+    The search pagination is tracked in the session's CMR-Search-After
+    header, so each chunk is given its own session to be run in a thread.
+    """
+
+    opts = ASFSearchOptions() if opts is None else copy(opts)
+    opts.merge_args(granule_list=granule_list, session=ASFSession())
+
+    return list(search_generator(opts=opts))
+
+
 class ASFSearchResultsExtended(ASFSearchResults):
     def download(
         self,
@@ -503,7 +671,7 @@ class ASFSearchResultsExtended(ASFSearchResults):
 
         :param path: The directory into which the products should be downloaded.
         :param session: The session to use. Defaults to the session used to fetch the results, or a new one if none was used.
-        :param processes: Number of download processes to use. Defaults to 1 (i.e. sequential download)
+        :param processes: Number of download threads to use. Defaults to 1 (i.e. sequential download)
         :param overwrite: Whether to overwrite existing files.
 
         :return: None
@@ -511,36 +679,14 @@ class ASFSearchResultsExtended(ASFSearchResults):
         logger.info(
             f"Started downloading ASFSearchResults of size {len(self)}."
         )
-        if processes == 1:
-            for product in self:
-                product.download(
-                    path=path,
-                    session=session,
-                    fileType=fileType,
-                    overwrite=overwrite,
-                )
-        else:
-            logger.info(f"Using {processes} threads - starting up pool.")
-
-            with ThreadPoolExecutor(max_workers=processes) as executor:
-                futures = {
-                    executor.submit(
-                        _download_product,
-                        (product, path, session, fileType, overwrite),
-                    )
-                    for product in self
-                }
-                for future in as_completed(futures):
-                    try:
-                        result = future.result()
-                        logger.debug(
-                            "Downloaded file successfully (threading): "
-                            f"({result})"
-                        )
-                    except Exception as e:
-                        logger.error(
-                            f"ASF downloading generated an exception: {e}"
-                        )
+        download_products(
+            self,
+            path=path,
+            session=session,
+            processes=processes,
+            fileType=fileType,
+            overwrite=overwrite,
+        )
 
     def raise_if_incomplete(self) -> None:
         if not self.searchComplete:
@@ -554,3 +700,87 @@ def _download_product(args) -> None:
     product.download(
         path=path, session=session, fileType=fileType, overwrite=overwrite
     )
+
+
+def download_products(
+    products: Iterable[ASFProductExtended],
+    path: str,
+    session: ASFSession = None,
+    processes: int = 1,
+    fileType=FileDownloadType.DEFAULT_FILE,
+    overwrite: bool = False,
+) -> int:
+    """
+    Downloads each product to the specified path as it is taken from the
+    iterable. When given a lazy iterable, such as the pages of
+    granule_search_generator(), downloads start while later pages are still
+    being searched for.
+
+    :param products: The products to download.
+    :param path: The directory into which the products should be downloaded.
+    :param session: The session to use. Defaults to the session used to fetch the results, or a new one if none was used.
+    :param processes: Number of download threads to use. Defaults to 1 (i.e. sequential download)
+    :param overwrite: Whether to overwrite existing files.
+
+    :return: The number of products taken from the iterable
+    """
+
+    count = 0
+
+    if processes == 1:
+        for product in products:
+            count += 1
+            product.download(
+                path=path,
+                session=session,
+                fileType=fileType,
+                overwrite=overwrite,
+            )
+        return count
+
+    logger.info(f"Using {processes} threads - starting up pool.")
+
+    if session is not None:
+        # Keep a pooled connection per host for each download thread, so that
+        # the threads reuse their connections instead of discarding them
+        # once the default pool of 10 is full
+        session.mount(
+            "https://",
+            HTTPAdapter(
+                pool_maxsize=max(
+                    processes, core.config.constants.HTTP_POOL_MAXSIZE
+                )
+            ),
+        )
+
+    # Only a few downloads per thread are queued at once, so that products
+    # are taken from the iterable as the downloads progress
+    window = 2 * processes
+
+    with ThreadPoolExecutor(max_workers=processes) as executor:
+        futures = set()
+        for product in products:
+            count += 1
+            if len(futures) >= window:
+                done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                _log_download_results(done)
+            futures.add(
+                executor.submit(
+                    _download_product,
+                    (product, path, session, fileType, overwrite),
+                )
+            )
+        _log_download_results(as_completed(futures))
+
+    return count
+
+
+def _log_download_results(futures: Iterable[Future]) -> None:
+    for future in futures:
+        try:
+            result = future.result()
+            logger.debug(
+                "Downloaded file successfully (threading): (%s)", result
+            )
+        except Exception as e:
+            logger.error(f"ASF downloading generated an exception: {e}")
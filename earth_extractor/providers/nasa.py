@@ -13,8 +13,6 @@ from shapely.geometry import Polygon
 if TYPE_CHECKING:
     from earth_extractor.satellites.base import Satellite
 
-credentials = get_credentials()
-
 logger = logging.getLogger(__name__)
 logger.setLevel(core.config.constants.LOGLEVEL_MODULE_DEFAULT)
 
@@ -53,27 +51,23 @@ class NASACommonMetadataRepository(Provider):
     ) -> List[CommonSearchResult]:
         """Translate search results from a provider to a common format"""
 
-        common_results = []
-        for record in provider_search_results:
-            # Get the satellite and processing level from reversed mapping of
-            # the provider's "products" dictionary
-            sat, level = self._products_reversed[record["collection"]]
-            datetime_obj = datetime.datetime.strptime(
-                record["properties"]["datetime"], "%Y-%m-%dT%H:%M:%S.%fZ"
-            )
-
-            common_results.append(
-                CommonSearchResult(
-                    product_id=record["id"],
-                    time=datetime_obj,
-                    geometry=Polygon(record["geometry"]["coordinates"][0]),
-                    url=record["assets"]["data"]["href"],
-                    processing_level=level,
-                    satellite=sat,
-                )
+        # Get the satellite and processing level from reversed mapping of
+        # the provider's "products" dictionary
+        products_reversed = self._products_reversed
+
+        return [
+            CommonSearchResult(
+                product_id=record["id"],
+                time=core.utils.parse_utc_timestamp(
+                    record["properties"]["datetime"]
+                ),
+                geometry=Polygon(record["geometry"]["coordinates"][0]),
+                url=record["assets"]["data"]["href"],
+                processing_level=products_reversed[record["collection"]][1],
+                satellite=products_reversed[record["collection"]][0],
             )
-
-        return common_results
+            for record in provider_search_results
+        ]
 
     def download_many(
         self,
@@ -105,19 +99,21 @@ class NASACommonMetadataRepository(Provider):
         # Check that the provider's credentials that are needed are set
         self._check_credentials_exist()
 
-        urls = [str(x.url) for x in search_results if x.url]
+        # Keep each URL once, in order, as the same product can be found by
+        # overlapping queries
+        urls = list(
+            dict.fromkeys(str(x.url) for x in search_results if x.url)
+        )
 
-        auth_header = {"Authorization": f"Bearer {credentials.NASA_TOKEN}"}
+        auth_header = {
+            "Authorization": f"Bearer {get_credentials().NASA_TOKEN}"
+        }
 
-        for url in urls:
-            try:
-                core.utils.download_parallel(
-                    urls, download_dir, auth_header, overwrite, processes
-                )
-            except RuntimeError as e:
-                # Log the exception and continue to the next file
-                logger.error(e)
-                continue
+        # Failed downloads are logged by download_parallel, which continues
+        # with the remaining files
+        core.utils.download_parallel(
+            urls, download_dir, auth_header, overwrite, processes
+        )
 
 
 nasa_cmr: NASACommonMetadataRepository = NASACommonMetadataRepository(
@@ -2,7 +2,6 @@ from earth_extractor.providers import Provider
 import logging
 from earth_extractor.satellites import enums
 from earth_extractor import core
-from earth_extractor.core.credentials import get_credentials
 from earth_extractor.core.models import CommonSearchResult
 from typing import Any, List, TYPE_CHECKING, Optional
 import pyproj
@@ -15,8 +14,6 @@ import requests
 if TYPE_CHECKING:
     from earth_extractor.satellites.base import Satellite
 
-credentials = get_credentials()
-
 logger = logging.getLogger(__name__)
 logger.setLevel(core.config.constants.LOGLEVEL_MODULE_DEFAULT)
 
@@ -0,0 +1,123 @@
+from earth_extractor.core import cache
+from earth_extractor.core.config import constants
+from earth_extractor.providers import base
+import datetime
+import os
+import pytest
+import pytest_mock
+import shapely.geometry
+import time
+
+
+class DummyProvider:
+    name = "dummy"
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    @cache.cached_query
+    def query(self, roi, start_date, end_date, limit=10):
+        self.calls += 1
+        return [self.calls]
+
+
+@pytest.fixture
+def query_cache(monkeypatch: pytest.MonkeyPatch, tmpdir: str) -> str:
+    monkeypatch.setattr(constants, "QUERY_CACHE_DIR", str(tmpdir))
+    monkeypatch.setattr(constants, "QUERY_CACHE_TTL", 60)
+
+    return str(tmpdir)
+
+
+def test_cached_query_reuses_results(query_cache: str) -> None:
+    """The same query should only reach the provider once"""
+
+    provider = DummyProvider()
+    roi = shapely.geometry.box(6.5, 46.5, 6.6, 46.6)
+    start = datetime.datetime(2023, 1, 1)
+    end = datetime.datetime(2023, 2, 1)
+
+    first = provider.query(roi, start, end)
+    second = provider.query(roi, start_date=start, end_date=end, limit=10)
+
+    assert first == second == [1]
+    assert provider.calls == 1, "Cached query was sent to the provider"
+
+    # A different argument is a different query
+    assert provider.query(roi, start, end, limit=5) == [2]
+
+
+def test_cached_query_disabled(
+    query_cache: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A TTL of 0 should always query the provider"""
+
+    monkeypatch.setattr(constants, "QUERY_CACHE_TTL", 0)
+    provider = DummyProvider()
+    roi = shapely.geometry.box(6.5, 46.5, 6.6, 46.6)
+    start = datetime.datetime(2023, 1, 1)
+
+    provider.query(roi, start, start)
+    provider.query(roi, start, start)
+
+    assert provider.calls == 2
+    assert os.listdir(query_cache) == [], "Disabled cache was written to"
+
+
+def test_cached_query_expires(query_cache: str) -> None:
+    """Expired results are queried again and deleted from the cache"""
+
+    provider = DummyProvider()
+    roi = shapely.geometry.box(6.5, 46.5, 6.6, 46.6)
+    start = datetime.datetime(2023, 1, 1)
+
+    provider.query(roi, start, start)
+    (cache_file,) = os.listdir(query_cache)
+    expired = time.time() - constants.QUERY_CACHE_TTL - 1
+    os.utime(os.path.join(query_cache, cache_file), (expired, expired))
+
+    # An expired result that belongs to another query is pruned on write
+    stale_file = os.path.join(query_cache, "stale.json")
+    with open(stale_file, "w") as f:
+        f.write("[]")
+    os.utime(stale_file, (expired, expired))
+
+    assert provider.query(roi, start, start) == [2], "Expired result used"
+    assert provider.calls == 2
+    assert os.listdir(query_cache) == [cache_file], "Expired file not deleted"
+
+
+def test_query_stac_is_cached(
+    query_cache: str,
+    mocker: pytest_mock.MockerFixture,
+    nasa_stac_query_response: dict,
+) -> None:
+    """STAC queries are cached, unless they find no features"""
+
+    open_catalog = mocker.patch.object(base, "_open_catalog")
+    search = open_catalog.return_value.search.return_value
+    search.item_collection_as_dict.return_value = nasa_stac_query_response
+
+    provider = base.Provider(name="STAC test")
+    roi = shapely.geometry.box(5.95, 45.81, 10.5, 47.81)
+    query = dict(
+        provider_uri="https://example.com/stac",
+        collections=["VNP02IMG"],
+        roi=roi,
+        start_date=datetime.datetime(2022, 11, 19),
+        end_date=datetime.datetime(2022, 11, 20),
+    )
+
+    for _ in range(2):
+        assert provider.query_stac(**query) == nasa_stac_query_response
+    assert open_catalog.call_count == 1, "Cached STAC query was repeated"
+
+    # Results without features are not cached
+    search.item_collection_as_dict.return_value = {
+        "type": "FeatureCollection",
+        "features": [],
+    }
+    query["collections"] = ["VNP03IMG"]
+    for _ in range(2):
+        provider.query_stac(**query)
+    assert open_catalog.call_count == 3, "Empty STAC results were cached"
@@ -1,7 +1,14 @@
+from earth_extractor import core
 from earth_extractor.core import utils
+import datetime
 import pyproj
 import shapely
 import math
+import os
+import pytest
+import pytest_mock
+import requests
+import requests_mock
 
 
 def test_buffer_at_equator_in_metres():
@@ -45,3 +52,116 @@ def test_buffer_at_tropics_in_metres():
         assert math.isclose(
             radius, buffer_size, rel_tol=1e-3
         ), f"Radius of {radius} too far from expected: {buffer_size}"
+
+
+def test_download_with_progress_fails_fast_on_client_error(
+    requests_mock: requests_mock.Mocker,
+    tmpdir: str,
+) -> None:
+    """A 404 is not retried, while a rate limit or server error would be"""
+
+    url = "https://example.com/data/granule.zip"
+    requests_mock.get(url, status_code=404)
+
+    with pytest.raises(requests.HTTPError):
+        utils.download_with_progress(url, str(tmpdir))
+
+    assert requests_mock.call_count == 1, "Client error was retried"
+
+    for status_code in [429, 500, 503]:
+        response = requests.Response()
+        response.status_code = status_code
+        assert utils.is_transient_error(
+            requests.HTTPError(response=response)
+        ), f"HTTP {status_code} should be retried"
+
+
+@pytest.mark.parametrize(
+    "timestamp",
+    [
+        "2022-11-19T00:42:00.000Z",
+        "2018-03-21T13:39:32.452Z",
+        "2016-11-19T17:07:09.166123Z",
+        "2016-11-19T17:07:09.1Z",
+    ],
+)
+def test_parse_utc_timestamp(timestamp: str) -> None:
+    """The timestamp matches the result of strptime on the same format"""
+
+    assert utils.parse_utc_timestamp(timestamp) == datetime.datetime.strptime(
+        timestamp, "%Y-%m-%dT%H:%M:%S.%fZ"
+    )
+
+
+def test_downloads_share_a_session(
+    requests_mock: requests_mock.Mocker,
+    tmpdir: str,
+) -> None:
+    """Successive downloads reuse the pooled connections of one session"""
+
+    session = utils.get_download_session()
+    assert utils.get_download_session() is session, "Session was not reused"
+
+    adapter = session.get_adapter("https://example.com")
+    assert adapter._pool_maxsize == core.config.constants.HTTP_POOL_MAXSIZE
+
+    for name in ["first.zip", "second.zip"]:
+        url = f"https://example.com/data/{name}"
+        requests_mock.get(
+            url,
+            content=b"1" * 10,
+            headers={"Content-Type": "application/zip"},
+        )
+        utils.download_with_progress(
+            url, str(tmpdir), headers={"Authorization": "Bearer token"}
+        )
+
+        assert os.path.getsize(os.path.join(tmpdir, name)) == 10
+        assert requests_mock.last_request.headers["Authorization"] == (
+            "Bearer token"
+        )
+
+
+@pytest.mark.parametrize("accept_ranges", [True, False])
+def test_download_with_progress_in_parts(
+    requests_mock: requests_mock.Mocker,
+    mocker: pytest_mock.MockerFixture,
+    tmpdir: str,
+    accept_ranges: bool,
+) -> None:
+    """A large file is downloaded in parts when the server accepts ranges"""
+
+    content = bytes(range(100))
+    url = "https://example.com/data/granule.hdf"
+    mocker.patch.object(
+        core.config.constants, "DOWNLOAD_PARALLELISM_MIN_SIZE", 50
+    )
+
+    def respond(request, context) -> bytes:
+        context.headers["Content-Type"] = "application/octet-stream"
+        if accept_ranges:
+            context.headers["Accept-Ranges"] = "bytes"
+        if "Range" not in request.headers:
+            context.headers["Content-Length"] = str(len(content))
+            return content
+
+        start, end = request.headers["Range"][len("bytes=") :].split("-")
+        context.status_code = 206
+        return content[int(start) : int(end) + 1]
+
+    requests_mock.get(url, content=respond)
+
+    utils.download_with_progress(url, str(tmpdir), parallelism=3)
+
+    with open(os.path.join(tmpdir, "granule.hdf"), "rb") as f:
+        assert f.read() == content, "Parts not written at their offset"
+
+    ranges = sorted(
+        request.headers["Range"]
+        for request in requests_mock.request_history
+        if "Range" in request.headers
+    )
+    if accept_ranges:
+        assert ranges == ["bytes=0-33", "bytes=34-67", "bytes=68-99"]
+    else:
+        assert ranges == [], "Ranges requested from a server without them"
@@ -1,11 +1,17 @@
 from earth_extractor.providers.alaskan_satellite_facility import asf
+from earth_extractor.providers.extensions import asf_search as asf_search_ext
+from earth_extractor.providers.extensions.asf_search import _is_complete
 from earth_extractor.core.models import CommonSearchResult
 import pytest
 import json
+import os
 import pytest_mock
 import asf_search
 from typing import List
+import requests
 import requests_mock
+import threading
+import time
 
 
 def test_authentication_exception(
@@ -92,3 +98,289 @@ def test_download_many(
         f"No files to download"
         in caplog.text
     ), "Expected text not found in log message"
+
+
+class FakeProduct:
+    """A stand-in for ASFProductExtended that records its downloads"""
+
+    def __init__(self, name: str, downloaded: bool = False) -> None:
+        self.properties = {"fileName": name}
+        self.downloaded = downloaded
+        self.download_calls = 0
+        self._lock = threading.Lock()
+
+    def download(self, path, session=None, fileType=None, overwrite=False):
+        with self._lock:
+            self.download_calls += 1
+
+    def is_downloaded(self, path: str) -> bool:
+        return self.downloaded
+
+
+@pytest.mark.parametrize("processes", [1, 3])
+def test_download_products(processes: int, tmpdir: str) -> None:
+    """Each product is downloaded once, with sequential and pooled downloads"""
+
+    products = [FakeProduct(f"granule_{i}") for i in range(10)]
+
+    # Pass an iterator, as the provider streams the products from the search
+    count = asf_search_ext.download_products(
+        iter(products), path=str(tmpdir), processes=processes
+    )
+
+    assert count == len(products), "Returned count is not the product count"
+    for product in products:
+        assert product.download_calls == 1, "Product not downloaded once"
+
+    # The search results class delegates to the same function
+    results = asf_search_ext.ASFSearchResultsExtended(products)
+    results.download(path=str(tmpdir), processes=processes)
+    for product in products:
+        assert product.download_calls == 2, "Product not downloaded again"
+
+
+def test_download_products_pools_connections_per_thread(tmpdir: str) -> None:
+    """The shared session keeps a pooled connection for each thread"""
+
+    session = asf_search.ASFSession()
+    products = [FakeProduct(f"granule_{i}") for i in range(3)]
+
+    asf_search_ext.download_products(
+        products, path=str(tmpdir), session=session, processes=32
+    )
+
+    adapter = session.get_adapter("https://datapool.asf.alaska.edu")
+    assert adapter._pool_maxsize == 32
+
+
+def test_download_products_takes_products_as_downloads_progress(
+    tmpdir: str,
+) -> None:
+    """Only a bounded number of products is queued ahead of the downloads"""
+
+    release = threading.Event()
+    taken = []
+
+    class BlockingProduct(FakeProduct):
+        def download(self, *args, **kwargs):
+            release.wait(timeout=5)
+
+    def products():
+        for i in range(100):
+            taken.append(i)
+            yield BlockingProduct(f"granule_{i}")
+
+    thread = threading.Thread(
+        target=asf_search_ext.download_products,
+        kwargs=dict(products=products(), path=str(tmpdir), processes=2),
+    )
+    thread.start()
+    time.sleep(0.1)
+    queued = len(taken)
+    release.set()
+    thread.join()
+
+    assert queued <= 2 * 2 + 1, "Products were queued before downloading"
+    assert len(taken) == 100
+
+
+def test_download_url_releases_connection(
+    requests_mock: requests_mock.Mocker,
+    mocker: pytest_mock.MockerFixture,
+    tmpdir: str,
+) -> None:
+    """The response is closed once the file is written"""
+
+    url = "https://datapool.asf.alaska.edu/GRD/granule.zip"
+    requests_mock.get(url, content=b"1" * 20)
+    close = mocker.spy(requests.Response, "close")
+
+    asf_search_ext.download_url(url=url, path=str(tmpdir))
+
+    assert close.call_count >= 1, "Response was not closed"
+
+
+def test_granule_search_generator_chunks(
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    """Long granule lists are searched in chunks, each with its own session"""
+
+    granules = [f"granule_{i}" for i in range(250)]
+    searched = []
+
+    def fake_search_generator(opts):
+        searched.append((list(opts.granule_list), opts.session))
+        # Two pages per chunk, holding the first and last granule names
+        return iter([[opts.granule_list[0]], [opts.granule_list[-1]]])
+
+    mocker.patch.object(
+        asf_search_ext, "search_generator", side_effect=fake_search_generator
+    )
+
+    pages = list(asf_search_ext.granule_search_generator(granules))
+
+    assert len(searched) == 3, "Each chunk should be searched once"
+    assert sorted(g for chunk, _ in searched for g in chunk) == sorted(
+        granules
+    ), "Not every granule was searched for"
+    assert (
+        len({id(session) for _, session in searched}) == 3
+    ), "Chunks should not share a session"
+    assert sorted(page[0] for page in pages) == sorted(
+        [
+            "granule_0",
+            "granule_99",
+            "granule_100",
+            "granule_199",
+            "granule_200",
+            "granule_249",
+        ]
+    ), "Not every page was yielded"
+
+
+def test_is_complete(tmpdir: str) -> None:
+    """Existing files are only complete when they match the expected size"""
+
+    filepath = os.path.join(str(tmpdir), "granule.zip")
+
+    assert not _is_complete(filepath), "Missing file considered complete"
+
+    with open(filepath, "wb") as f:
+        f.write(b"0" * 10)
+
+    assert _is_complete(filepath), "Existing file of unknown size incomplete"
+    assert _is_complete(filepath, 10), "File of expected size incomplete"
+    assert not _is_complete(filepath, 20), "Partial file considered complete"
+
+
+def test_download_url_redownloads_incomplete_file(
+    tmpdir: str,
+    requests_mock: requests_mock.Mocker,
+) -> None:
+    """A partial file is downloaded again even when not overwriting"""
+
+    url = "https://datapool.asf.alaska.edu/GRD/granule.zip"
+    requests_mock.get(url, content=b"1" * 20)
+
+    filepath = os.path.join(str(tmpdir), "granule.zip")
+    with open(filepath, "wb") as f:
+        f.write(b"0" * 10)  # Interrupted download
+
+    for _ in range(2):  # The second call finds the complete file
+        asf_search_ext.download_url(
+            url,
+            str(tmpdir),
+            session=asf_search.ASFSession(),
+            overwrite=False,
+            expected_size=20,
+        )
+
+    assert requests_mock.call_count == 1, "Expected a single download"
+    with open(filepath, "rb") as f:
+        assert f.read() == b"1" * 20, "Partial file not replaced"
+
+
+def test_download_url_resumes_incomplete_file(
+    tmpdir: str,
+    requests_mock: requests_mock.Mocker,
+) -> None:
+    """A partial file is completed with a range request"""
+
+    url = "https://datapool.asf.alaska.edu/GRD/granule.zip"
+    requests_mock.get(
+        url,
+        status_code=206,
+        content=b"1" * 10,
+        headers={"Content-Range": "bytes 10-19/20"},
+    )
+
+    filepath = os.path.join(str(tmpdir), "granule.zip")
+    with open(filepath, "wb") as f:
+        f.write(b"0" * 10)  # Interrupted download
+
+    asf_search_ext.download_url(
+        url,
+        str(tmpdir),
+        session=asf_search.ASFSession(),
+        overwrite=False,
+        expected_size=20,
+    )
+
+    assert requests_mock.last_request.headers["Range"] == "bytes=10-"
+    with open(filepath, "rb") as f:
+        assert f.read() == b"0" * 10 + b"1" * 10, "Partial file not resumed"
+
+
+def test_download_many_skips_downloaded_products(
+    mocker: pytest_mock.MockerFixture,
+    sentinel_query_as_commonsearch_result: List[CommonSearchResult],
+    tmpdir: str,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Products already downloaded in full are not handed to the downloader"""
+
+    complete = FakeProduct("complete.zip", downloaded=True)
+    partial = FakeProduct("partial.zip")
+    downloaded = []
+
+    def fake_download_products(products, **kwargs):
+        downloaded.extend(products)
+        return len(downloaded)
+
+    mocker.patch.object(
+        asf_search.ASFSession,
+        "auth_with_token",
+        return_value=asf_search.ASFSession(),
+    )
+    mocker.patch(
+        "earth_extractor.providers.alaskan_satellite_facility."
+        "granule_search_generator",
+        return_value=iter([[complete], [partial]]),
+    )
+    mocker.patch(
+        "earth_extractor.providers.alaskan_satellite_facility."
+        "download_products",
+        side_effect=fake_download_products,
+    )
+
+    asf.download_many(
+        search_results=sentinel_query_as_commonsearch_result,
+        download_dir=str(tmpdir),
+        overwrite=False,
+    )
+
+    assert downloaded == [partial], "Downloaded product was not skipped"
+    assert "1 files already downloaded" in caplog.text
+
+
+def test_download_many_searches_each_granule_once(
+    mocker: pytest_mock.MockerFixture,
+    sentinel_query_as_commonsearch_result: List[CommonSearchResult],
+    tmpdir: str,
+) -> None:
+    """Duplicate search results are searched for and downloaded once"""
+
+    mocker.patch.object(
+        asf_search.ASFSession,
+        "auth_with_token",
+        return_value=asf_search.ASFSession(),
+    )
+    search = mocker.patch(
+        "earth_extractor.providers.alaskan_satellite_facility."
+        "granule_search_generator",
+        return_value=iter([]),
+    )
+    mocker.patch(
+        "earth_extractor.providers.alaskan_satellite_facility."
+        "download_products",
+        return_value=0,
+    )
+
+    results = sentinel_query_as_commonsearch_result
+    asf.download_many(
+        search_results=results + results, download_dir=str(tmpdir)
+    )
+
+    assert search.call_args.args[0] == [
+        result.identifier for result in results
+    ]
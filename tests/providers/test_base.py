@@ -0,0 +1,44 @@
+from earth_extractor.providers import base
+import pytest_mock
+
+
+def test_open_catalog_is_cached(mocker: pytest_mock.MockerFixture) -> None:
+    """The STAC catalog root should only be opened once per URI"""
+
+    base._open_catalog.cache_clear()
+    client_open = mocker.patch.object(base.Client, "open")
+
+    for _ in range(3):
+        base._open_catalog("https://example.com/stac")
+    base._open_catalog("https://example.org/stac")
+
+    assert client_open.call_count == 2, "Catalog opened more than once per URI"
+
+    base._open_catalog.cache_clear()
+
+
+def test_provider_defaults_are_not_shared() -> None:
+    """Providers without products or credentials do not share containers"""
+
+    first = base.Provider(name="first")
+    second = base.Provider(name="second")
+
+    first.products[("satellite", "level")] = ["product"]
+    first.credentials_required.append("TOKEN")
+
+    assert second.products == {}, "Products shared between providers"
+    assert second.credentials_required == [], "Credentials shared"
+
+
+def test_orjson_stac_api_io() -> None:
+    """STAC responses are parsed into plain dictionaries"""
+
+    stac_io = base.OrjsonStacApiIO()
+    page = stac_io.json_loads(
+        '{"type": "FeatureCollection", "features": [{"id": "granule"}]}'
+    )
+
+    assert page == {
+        "type": "FeatureCollection",
+        "features": [{"id": "granule"}],
+    }
@@ -0,0 +1,305 @@
+from earth_extractor.providers import copernicus
+from earth_extractor.providers.copernicus import (
+    CopernicusDataSpace,
+    copernicus_dataspace,
+)
+from earth_extractor.satellites import enums, sentinel
+from earth_extractor.core.config import constants
+from earth_extractor.core.models import CommonSearchResult
+from collections import OrderedDict
+from typing import List
+import copy
+import dataclasses
+import datetime
+import os
+import pytest
+import pytest_mock
+import requests_mock
+import shapely.geometry
+
+
+PRODUCTS_URL = "https://catalogue.dataspace.copernicus.eu/odata/v1/Products"
+QUERY_URL = f"{PRODUCTS_URL}?$filter=Name eq 'test'&$top=1000"
+
+
+def test_query_odata_fetches_pages_by_offset(
+    requests_mock: requests_mock.Mocker,
+) -> None:
+    """Pages after the first are requested by offset and kept in order"""
+
+    total = 2500
+    page_size = copernicus.ODATA_PAGE_SIZE
+
+    def page(request, context) -> dict:
+        skip = int(request.qs.get("$skip", ["0"])[0])
+        end = min(skip + page_size, total)
+        products = {
+            "value": [{"Id": i} for i in range(skip, end)],
+            "@odata.count": total,
+        }
+        if end < total:
+            products["@odata.nextLink"] = f"{QUERY_URL}&$skip=next"
+
+        return products
+
+    requests_mock.get(PRODUCTS_URL, json=page)
+
+    products = copernicus_dataspace._query_odata(QUERY_URL)
+
+    assert [product["Id"] for product in products] == list(range(total))
+    assert requests_mock.call_count == 3, "Expected one request per page"
+
+
+def test_query_odata_follows_next_link_without_count(
+    requests_mock: requests_mock.Mocker,
+) -> None:
+    """Without a total count, the nextLink of each page is followed"""
+
+    next_url = f"{QUERY_URL}&$skip=1000"
+    requests_mock.get(
+        QUERY_URL,
+        json={"value": [{"Id": 0}], "@odata.nextLink": next_url},
+        complete_qs=True,
+    )
+    requests_mock.get(next_url, json={"value": [{"Id": 1}]})
+
+    products = copernicus_dataspace._query_odata(QUERY_URL)
+
+    assert [product["Id"] for product in products] == [0, 1]
+    assert requests_mock.call_count == 2
+
+
+def test_access_token_is_reused_then_refreshed(
+    requests_mock: requests_mock.Mocker,
+) -> None:
+    """The token is requested once, and renewed with the refresh token"""
+
+    token = requests_mock.post(
+        copernicus.TOKEN_URL,
+        json={
+            "access_token": "token",
+            "expires_in": 600,
+            "refresh_token": "refresh",
+            "refresh_expires_in": 3600,
+        },
+    )
+    provider = CopernicusDataSpace(name="test", description="", uri="")
+
+    for _ in range(2):
+        assert provider.get_access_token("user", "password") == "token"
+    assert token.call_count == 1, "Valid access token was requested again"
+    assert "grant_type=password" in token.last_request.text
+
+    provider._token_expiry = 0
+    assert provider.get_access_token("user", "password") == "token"
+    assert token.call_count == 2
+    assert "grant_type=refresh_token" in token.last_request.text
+
+
+def test_session_retries_transient_errors() -> None:
+    """The session retries rate limited and server error responses"""
+
+    provider = CopernicusDataSpace(name="test", description="", uri="")
+    retries = provider.session.get_adapter(PRODUCTS_URL).max_retries
+
+    assert retries.total == constants.MAX_REQUEST_ATTEMPTS
+    assert retries.respect_retry_after_header
+    assert {429, 503} <= set(retries.status_forcelist)
+    assert {"GET", "POST"} <= retries.allowed_methods
+    assert provider.session is provider.session, "Session was not reused"
+
+
+def test_translate_search_results(scihub_query_response: OrderedDict) -> None:
+    """OData products are translated by their productType attribute"""
+
+    results = copernicus_dataspace.translate_search_results(
+        scihub_query_response
+    )
+
+    assert len(results) == len(scihub_query_response["value"])
+    first = results[0]
+    assert first.product_id == "a07ea1c1-f46b-5e0a-9e8a-ffe11b1abc2d"
+    assert first.satellite == enums.Satellite.SENTINEL1
+    assert first.processing_level == enums.ProcessingLevel.L1
+    assert first.time == datetime.datetime(2018, 3, 21, 13, 39, 32, 452000)
+    assert first.geometry.bounds == (9.031395, 46.924618, 12.88131, 48.819859)
+
+
+def test_translate_search_results_skips_unknown_product_type(
+    scihub_query_response: OrderedDict,
+) -> None:
+    """Products of a type that is not configured are skipped"""
+
+    product = copy.deepcopy(scihub_query_response["value"][0])
+    for attribute in product["Attributes"]:
+        if attribute["Name"] == "productType":
+            attribute["Value"] = "UNKNOWN"
+
+    assert copernicus_dataspace.translate_search_results(
+        {"value": [product]}
+    ) == []
+
+
+def test_query_products_falls_back_to_all_fields(
+    requests_mock: requests_mock.Mocker,
+    scihub_query_response: OrderedDict,
+) -> None:
+    """A query that fails to select fields is repeated with all fields"""
+
+    def page(request, context) -> dict:
+        if "select" in request.query:
+            context.status_code = 400
+            return {}
+
+        return scihub_query_response
+
+    requests_mock.get(PRODUCTS_URL, json=page)
+
+    products = copernicus_dataspace._query_products(QUERY_URL)
+
+    assert products == scihub_query_response["value"]
+    assert requests_mock.call_count == 2
+    assert "expand=assets" in requests_mock.last_request.query
+
+
+def test_download_many_without_urls_skips_token(
+    requests_mock: requests_mock.Mocker,
+) -> None:
+    """No access token is requested when there is nothing to download"""
+
+    token = requests_mock.post(copernicus.TOKEN_URL, json={})
+
+    copernicus_dataspace.download_many([], "data")
+
+    assert token.call_count == 0
+
+
+def test_access_token_failure_raises_value_error(
+    requests_mock: requests_mock.Mocker,
+) -> None:
+    """A rejected password grant is raised as a single ValueError"""
+
+    requests_mock.post(copernicus.TOKEN_URL, status_code=401)
+    provider = CopernicusDataSpace(name="test", description="", uri="")
+
+    with pytest.raises(ValueError, match="access token creation failed"):
+        provider.get_access_token("user", "password")
+
+
+def test_query_product_types_concurrently(
+    mocker: pytest_mock.MockerFixture,
+    roi_switzerland: shapely.geometry.base.BaseGeometry,
+    scihub_query_response: OrderedDict,
+) -> None:
+    """Every product type of the processing level is queried"""
+
+    def query_products(query_url: str) -> list:
+        products = copy.deepcopy(scihub_query_response["value"][:1])
+        product_type = "OL_2_LFR___" if "LFR" in query_url else "OL_2_WFR___"
+        for attribute in products[0]["Attributes"]:
+            if attribute["Name"] == "productType":
+                attribute["Value"] = product_type
+
+        return products
+
+    query = mocker.patch.object(
+        CopernicusDataSpace, "_query_products", side_effect=query_products
+    )
+
+    results = copernicus_dataspace.query(
+        satellite=sentinel.sentinel_3,
+        processing_level=enums.ProcessingLevel.L2,
+        roi=roi_switzerland,
+        start_date=datetime.datetime(2020, 1, 1),
+        end_date=datetime.datetime(2020, 1, 31),
+    )
+
+    assert query.call_count == 2
+    assert len(results) == 2
+    assert all(
+        result.satellite == enums.Satellite.SENTINEL3 for result in results
+    )
+
+
+@pytest.mark.parametrize(
+    "cloud_cover, expected",
+    [(None, False), (100, False), (10, True), (0, True)],
+)
+def test_query_cloud_cover_filter(
+    mocker: pytest_mock.MockerFixture,
+    roi_switzerland: shapely.geometry.base.BaseGeometry,
+    cloud_cover: int,
+    expected: bool,
+) -> None:
+    """The cloud cover is only filtered when its maximum is below 100%"""
+
+    query = mocker.patch.object(
+        CopernicusDataSpace, "_query_products", return_value=[]
+    )
+
+    copernicus_dataspace.query(
+        satellite=sentinel.sentinel_2,
+        processing_level=enums.ProcessingLevel.L2A,
+        roi=roi_switzerland,
+        start_date=datetime.datetime(2020, 1, 1),
+        end_date=datetime.datetime(2020, 1, 31),
+        cloud_cover=cloud_cover,
+    )
+
+    (query_url,) = query.call_args.args
+    assert ("'cloudCover'" in query_url) is expected
+
+
+def test_download_many_skips_downloaded_products(
+    mocker: pytest_mock.MockerFixture,
+    tmpdir: str,
+    sentinel_query_as_commonsearch_result: List[CommonSearchResult],
+) -> None:
+    """Products with a complete archive on disk are not requested again"""
+
+    results = [
+        dataclasses.replace(result, size=10)
+        for result in sentinel_query_as_commonsearch_result
+    ]
+    complete, incomplete = results[0], results[1]
+    with open(os.path.join(tmpdir, f"{complete.filename}.zip"), "wb") as f:
+        f.write(b"1" * 10)
+    with open(os.path.join(tmpdir, f"{incomplete.filename}.zip"), "wb") as f:
+        f.write(b"1" * 5)
+
+    mocker.patch.object(
+        CopernicusDataSpace, "get_access_token", return_value="token"
+    )
+    download_parallel = mocker.patch(
+        "earth_extractor.core.utils.download_parallel"
+    )
+
+    copernicus_dataspace.download_many(results, str(tmpdir))
+
+    urls = download_parallel.call_args.args[0]
+    assert urls == [result.url for result in results[1:]]
+
+    copernicus_dataspace.download_many(results, str(tmpdir), overwrite=True)
+
+    urls = download_parallel.call_args.args[0]
+    assert urls == [result.url for result in results]
+
+
+def test_query_without_product_types(
+    mocker: pytest_mock.MockerFixture,
+    roi_switzerland: shapely.geometry.base.BaseGeometry,
+) -> None:
+    """A level without product types returns nothing without querying"""
+
+    query = mocker.patch.object(CopernicusDataSpace, "_query_products")
+
+    results = copernicus_dataspace.query(
+        satellite=sentinel.sentinel_2,
+        processing_level=enums.ProcessingLevel.L1,
+        roi=roi_switzerland,
+        start_date=datetime.datetime(2020, 1, 1),
+        end_date=datetime.datetime(2020, 1, 31),
+    )
+
+    assert results == []
+    assert not query.called
@@ -63,3 +63,23 @@ def test_query(
             ), "Geometry does not match"
 
     assert match is True, "Product ID 'LAADS:7188953671' not found in response"
+
+
+def test_download_many_downloads_each_url_once(
+    nasa_stac_query_response: OrderedDict,
+    mocker: pytest_mock.MockerFixture,
+):
+    """Duplicate results are downloaded once, in a single parallel batch"""
+
+    download_parallel = mocker.patch(
+        "earth_extractor.core.utils.download_parallel"
+    )
+    results = nasa_cmr.translate_search_results(
+        nasa_stac_query_response["features"]
+    )
+
+    nasa_cmr.download_many(results + results, "data")
+
+    download_parallel.assert_called_once()
+    urls = download_parallel.call_args.args[0]
+    assert urls == [result.url for result in results]